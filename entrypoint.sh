@@ -1,2 +1,2 @@
 #!/bin/bash
-python graylogHUB.py --function-url "$FUNCTION_URL" --port "$GELF_PORT" "$@" 
\ No newline at end of file
+exec python graylogHUB.py --function-url "$FUNCTION_URL" --port "$GELF_PORT" "$@" 
\ No newline at end of file
@@ -1,14 +1,28 @@
 import socket
+import asyncio
+import collections
+import functools
+import gzip
+import random
 import json
-import requests
-from threading import Thread
+import re
+import msgspec
+import aiohttp
+import zstandard
+from yarl import URL
 import logging
+import signal
 import time
 import sys
-from typing import Optional
+from typing import Deque, Optional, Set
 import os
 import traceback
 
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
 # Configure logging to output to stdout
 logging.basicConfig(
     level=logging.INFO,
@@ -19,174 +33,565 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Used to split concatenated JSON from producers that omit the null byte
+_DECODER = json.JSONDecoder()
+_JSON_WHITESPACE = b' \t\r\n'
+_WHITESPACE = re.compile(rb'[ \t\r\n]*')
+_RESYNC = re.compile(r'[{\n]')
+
 # Force stdout to be line-buffered
 if hasattr(sys.stdout, 'reconfigure'):
     sys.stdout.reconfigure(line_buffering=True)
 
+class GELFMessage(msgspec.Struct):
+    """Routing fields checked on every frame; all other fields are skipped without being decoded"""
+    host: str
+    level: int = 6
+
+_GELF_DECODER = msgspec.json.Decoder(GELFMessage)
+
+class GELFClientProtocol(asyncio.BufferedProtocol):
+    """Per-connection framing state, driven by the event loop's selector"""
+
+    def __init__(self, forwarder: 'GELFForwarder'):
+        self.forwarder = forwarder
+        self.transport: Optional[asyncio.Transport] = None
+        self.address: Optional[tuple] = None
+        self.buffer = bytearray()
+        # Offset up to which the buffer is known not to contain a delimiter
+        self.scanned = 0
+        # Set while skipping the remainder of an oversized frame
+        self.discarding = False
+        # Set once the client has sent a null byte, i.e. frames per the GELF spec
+        self.delimited = False
+        self.last_activity = 0.0
+        self.idle_timer: Optional[asyncio.TimerHandle] = None
+
+    def connection_made(self, transport: asyncio.Transport):
+        self.transport = transport
+        self.address = transport.get_extra_info('peername')
+        self.last_activity = self.forwarder.clock
+        if not self.forwarder.register_connection(self):
+            return
+        self.idle_timer = asyncio.get_running_loop().call_later(
+            self.forwarder.connection_timeout, self._check_idle)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        # Reads go into a receive buffer shared by all connections, which is
+        # safe because buffer_updated() consumes it before the next read
+        return self.forwarder.receive_view
+
+    def buffer_updated(self, nbytes: int):
+        self.last_activity = self.forwarder.clock
+        try:
+            self._consume(nbytes)
+        except Exception as e:
+            logger.error("Error handling client %s: %s", self.address, e)
+            self.transport.close()
+
+    def _consume(self, nbytes: int):
+        buffer = self.buffer
+        buffer.extend(self.forwarder.receive_view[:nbytes])
+        
+        # GELF TCP frames are terminated by a null byte. Frames are
+        # handed over as views so only valid messages get copied out.
+        start = 0
+        with memoryview(buffer) as view:
+            while True:
+                end = buffer.find(b'\x00', max(start, self.scanned))
+                if end == -1:
+                    break
+                
+                if self.discarding:
+                    self.discarding = False
+                elif end - start > self.forwarder.max_message_size:
+                    logger.error("Message from %s exceeds %d bytes, dropping", self.address, self.forwarder.max_message_size)
+                    self.forwarder.messages_failed += 1
+                elif end > start:
+                    self.forwarder.process_message(view[start:end], self.address)
+                start = end + 1
+        
+        # Drop consumed frames in one go
+        if start:
+            del buffer[:start]
+            self.delimited = True
+        
+        # Producers that never send a null byte get undelimited framing, tried
+        # only when the data could end in a complete object
+        if not self.delimited:
+            tail = len(buffer)
+            while tail and buffer[tail - 1] in _JSON_WHITESPACE:
+                tail -= 1
+            if buffer[tail - 1:tail] == b'}':
+                self._consume_undelimited()
+        self.scanned = len(buffer)
+        
+        if len(buffer) > self.forwarder.max_message_size:
+            logger.error("Message from %s exceeds %d bytes, dropping", self.address, self.forwarder.max_message_size)
+            self.forwarder.messages_failed += 1
+            # Skip the rest of the frame up to its null byte; undelimited
+            # streams resync on the next object instead
+            self.discarding = self.delimited
+            buffer.clear()
+            self.scanned = 0
+
+    def _consume_undelimited(self):
+        """Split back-to-back JSON objects sent without null-byte terminators"""
+        buffer = self.buffer
+        # surrogateescape keeps character and byte offsets convertible both ways
+        text = buffer.decode('utf-8', 'surrogateescape')
+        pos = 0
+        offset = 0
+        consumed = 0
+        with memoryview(buffer) as view:
+            while True:
+                # JSON whitespace is ASCII, so characters and bytes advance together
+                skip = _WHITESPACE.match(buffer, offset).end() - offset
+                offset += skip
+                pos += skip
+                if pos == len(text):
+                    consumed = offset
+                    break
+                try:
+                    _, end = _DECODER.raw_decode(text, pos)
+                    valid = True
+                except json.JSONDecodeError as e:
+                    # Until EOF the buffer ends in '}', so truncated input can
+                    # only fail at the end or inside an unterminated string
+                    if e.pos == len(text) or e.msg.startswith('Unterminated string'):
+                        # Incomplete object; wait for more data
+                        break
+                    # Malformed data; drop it and resync on the next object or line
+                    match = _RESYNC.search(text, max(e.pos, pos + 1))
+                    end = match.start() if match else len(text)
+                    valid = False
+                size = len(text[pos:end].encode('utf-8', 'surrogateescape'))
+                if valid and size <= self.forwarder.max_message_size:
+                    self.forwarder.process_message(view[offset:offset + size], self.address)
+                else:
+                    self.forwarder.messages_failed += 1
+                offset += size
+                pos = end
+                consumed = offset
+        if consumed:
+            del buffer[:consumed]
+
+    def eof_received(self) -> bool:
+        # Split off complete objects whatever the buffer ends with
+        if not self.delimited:
+            self._consume_undelimited()
+        # Flush a trailing frame sent without a terminating null byte
+        if self.buffer and not self.discarding:
+            self.forwarder.process_message(memoryview(self.buffer), self.address)
+        return False
+
+    def connection_lost(self, exc: Optional[Exception]):
+        if exc:
+            logger.error("Error handling client %s: %s", self.address, exc)
+        if self.idle_timer:
+            self.idle_timer.cancel()
+        self.forwarder.unregister_connection(self)
+
+    def _check_idle(self):
+        # Re-armed instead of reset on every read to keep buffer_updated cheap
+        idle = self.forwarder.clock - self.last_activity
+        # Clients are not idle while reads are paused for backpressure
+        if self.forwarder.reading_paused:
+            idle = 0
+        if idle >= self.forwarder.connection_timeout:
+            logger.error("Error handling client %s: timed out", self.address)
+            self.transport.close()
+        else:
+            # The clock only advances once a second, so never re-check sooner
+            self.idle_timer = asyncio.get_running_loop().call_later(
+                max(self.forwarder.connection_timeout - idle, 1), self._check_idle)
+
 class GELFForwarder:
-    def __init__(self, tcp_host: str, tcp_port: int, function_url: str, buffer_size: int = 8192,
-                 connection_timeout: int = 60, max_message_size: int = 1024 * 1024):  # 1MB default max
+    def __init__(self, tcp_host: str, tcp_port: int, function_url: str, buffer_size: int = 64 * 1024,
+                 connection_timeout: int = 60, max_message_size: int = 1024 * 1024,  # 1MB default max
+                 max_concurrent_requests: int = 64, batch_size: int = 100,
+                 batch_max_bytes: int = 256 * 1024, flush_interval: float = 0.25,
+                 max_queued_batches: int = 100, compression: str = 'none',
+                 zstd_dictionary: Optional[bytes] = None, max_connections: int = 1024,
+                 reuse_port: bool = False):
         self.tcp_host = tcp_host
         self.tcp_port = tcp_port
         self.function_url = function_url
+        # Parsed and built once instead of on every post
+        self.request_url = URL(function_url)
+        self.request_headers = {'Content-Type': 'application/json'}
+        # Batch bodies are compressed once, before the first attempt
+        if compression == 'gzip':
+            # Compression runs on the event loop; level 9 costs several ms per batch
+            self.compress = functools.partial(gzip.compress, compresslevel=6)
+        elif compression == 'zstd':
+            # A dictionary trained on GELF traffic helps a lot on small batches
+            dict_data = zstandard.ZstdCompressionDict(zstd_dictionary) if zstd_dictionary else None
+            self.compress = zstandard.ZstdCompressor(level=3, dict_data=dict_data).compress
+        elif compression == 'none':
+            self.compress = None
+        else:
+            raise ValueError(f"Unsupported compression: {compression}")
+        if self.compress:
+            self.request_headers['Content-Encoding'] = compression
         self.buffer_size = buffer_size
         self.connection_timeout = connection_timeout
         self.max_message_size = max_message_size
+        # Bounds worst-case buffer memory at about max_connections * max_message_size
+        self.max_connections = max_connections
+        # Only set for worker processes; otherwise a second instance must fail to bind
+        self.reuse_port = reuse_port
+        self.max_concurrent_requests = max_concurrent_requests
+        self.batch_size = batch_size
+        self.batch_max_bytes = batch_max_bytes
+        self.flush_interval = flush_interval
+        self.max_queued_batches = max_queued_batches
+        # Validated messages staged until they fill a batch
+        self.batch: Deque[bytes] = collections.deque()
+        self.batch_bytes = 0
         self.server_socket: Optional[socket.socket] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+        # Single receive buffer shared by all connections on the event loop
+        self.receive_view = memoryview(bytearray(buffer_size))
+        self.connections: Set[GELFClientProtocol] = set()
+        # Set while client reads are paused because the forward queue is full
+        self.reading_paused = False
+        # Created inside the event loop by _serve()
+        self.http_client: Optional[aiohttp.ClientSession] = None
+        # Batches waiting for a forwarder worker: (body, count, attempt)
+        self.forward_queue: Optional[asyncio.Queue] = None
+        # Failed batches whose backoff has elapsed: (body, count, attempt)
+        self.retry_queue: Optional[asyncio.Queue] = None
+        self.max_attempts = 3
+        self.retry_delay = 0.5
+        self.max_queued_retries = 1000
+        # Batches and messages scheduled for a retry but not yet forwarded again
+        self.queued_retries = 0
+        self.queued_retry_messages = 0
         # Metrics
         self.messages_processed = 0
         self.messages_failed = 0
-        self.connections_handled = 0
+        self.messages_dropped = 0
+        self.total_connections = 0
+        self.active_connections = 0
+        self.connections_rejected = 0
         self.start_time = None
-        self.last_metrics_time = time.time()
+        self.last_metrics_time = time.monotonic()
         self.metrics_interval = 60  # Log metrics every 60 seconds
+        # Coarse monotonic clock for per-read bookkeeping, refreshed every second
+        self.clock = time.monotonic()
         logger.info("GELFForwarder initialized with function URL: %s", function_url)
         
     def start(self):
         """Start the TCP server"""
+        if uvloop:
+            # libuv-backed event loop with faster socket transports
+            uvloop.run(self._serve())
+        else:
+            asyncio.run(self._serve())
+        
+    async def _serve(self):
+        """Run the TCP server and the shared HTTP client on the event loop"""
+        loop = asyncio.get_running_loop()
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         # Allow port reuse
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # Let several worker processes bind the same port; the kernel spreads
+        # incoming connections across them
+        if self.reuse_port:
+            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         self.server_socket.bind((self.tcp_host, self.tcp_port))
-        self.server_socket.listen(5)
+        self.server_socket.setblocking(False)
+        
+        # Shared keep-alive connection pool for all clients
+        connector = aiohttp.TCPConnector(
+            limit=256,
+            keepalive_timeout=75,
+            use_dns_cache=True,
+            ttl_dns_cache=300
+        )
+        self.http_client = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=10)
+        )
+        self.forward_queue = asyncio.Queue(maxsize=self.max_queued_batches)
+        self.retry_queue = asyncio.Queue()
+        # A fixed pool of forwarders bounds the number of in-flight requests
+        forwarders = [asyncio.create_task(self._forward_queued_batches())
+                      for _ in range(self.max_concurrent_requests)]
+        flusher = asyncio.create_task(self._flush_periodically())
+        retrier = asyncio.create_task(self._retry_failed_batches())
+        reporter = asyncio.create_task(self._log_metrics_periodically())
+        ticker = asyncio.create_task(self._update_clock_periodically())
         
         self.start_time = time.time()
         logger.info(f"Server listening on {self.tcp_host}:{self.tcp_port}")
         
-        while True:
+        try:
+            self.server = await loop.create_server(
+                lambda: GELFClientProtocol(self),
+                sock=self.server_socket,
+                # Absorb connection bursts such as a fleet of producers restarting
+                backlog=socket.SOMAXCONN
+            )
+            # docker stop sends SIGTERM; shut down through the same drain as Ctrl-C
+            stopping = asyncio.Event()
             try:
-                client_socket, address = self.server_socket.accept()
-                logger.info(f"Accepted connection from {address}")
-                client_thread = Thread(target=self.handle_client, args=(client_socket, address))
-                client_thread.daemon = True
-                client_thread.start()
-            except Exception as e:
-                logger.error(f"Error accepting connection: {e}")
+                loop.add_signal_handler(signal.SIGTERM, stopping.set)
+            except NotImplementedError:  # Not supported on Windows
+                pass
+            await stopping.wait()
+            logger.info("Received SIGTERM, shutting down...")
+        finally:
+            if self.server:
+                self.server.close()
+            self.server_socket.close()
+            for connection in list(self.connections):
+                connection.transport.close()
+            flusher.cancel()
+            retrier.cancel()
+            reporter.cancel()
+            ticker.cancel()
+            # Post whatever is still buffered before closing the HTTP client,
+            # refilling the queue as it drains
+            self.flush_batch()
+            while self.batch:
+                await self.forward_queue.join()
+                self.flush_batch()
+            await self.forward_queue.join()
+            for forwarder in forwarders:
+                forwarder.cancel()
+            if self.queued_retries:
+                logger.error("Dropping %d batches (%d messages) awaiting retry", self.queued_retries, self.queued_retry_messages)
+                self.messages_failed += self.queued_retry_messages
+            await self.http_client.close()
                 
-    def handle_client(self, client_socket: socket.socket, address: tuple):
-        """Handle individual client connections"""
-        buffer = ""
-        client_socket.settimeout(self.connection_timeout)
-        self.connections_handled += 1
+    def register_connection(self, connection: GELFClientProtocol) -> bool:
+        """Track a newly accepted client connection, or close it when at the limit"""
+        if self.active_connections >= self.max_connections:
+            # Log once per metrics interval; rejections are counted in the metrics
+            if not self.connections_rejected:
+                logger.error("Rejecting connections: %d connections active", self.active_connections)
+            self.connections_rejected += 1
+            connection.transport.close()
+            return False
         
-        while True:
-            try:
-                data = client_socket.recv(self.buffer_size)
-                if not data:
-                    break
-                
-                # Decode received data
-                decoded_data = data.decode('utf-8')
-                
-                # Add to buffer
-                buffer += decoded_data
-                
-                # Process complete JSON objects
-                while True:
-                    try:
-                        # Find the start of a JSON object
-                        start = buffer.find('{')
-                        if start == -1:
-                            buffer = ""
-                            break
-                            
-                        # Try to parse what we have
-                        json.loads(buffer[start:])
-                        # If successful, we have a complete message
-                        self.process_message(buffer[start:], address)
-                        buffer = ""
-                        break
-                        
-                    except json.JSONDecodeError as e:
-                        if "Extra data" in str(e):
-                            pos = int(str(e).split('char ')[-1].strip(')'))
-                            self.process_message(buffer[start:start+pos], address)
-                            buffer = buffer[start+pos:]
-                        else:
-                            break
-                
-            except Exception as e:
-                logger.error(f"Error handling client {address}: {e}")
-                break
+        logger.debug("Accepted connection from %s", connection.address)
+        self.configure_client_socket(connection.transport.get_extra_info('socket'))
+        self.connections.add(connection)
+        self.total_connections += 1
+        self.active_connections += 1
+        if self.reading_paused:
+            connection.transport.pause_reading()
+        return True
+            
+    def unregister_connection(self, connection: GELFClientProtocol):
+        """Forget a closed client connection"""
+        if connection in self.connections:
+            self.connections.remove(connection)
+            self.active_connections -= 1
                 
-        client_socket.close()
+    def configure_client_socket(self, client_socket: socket.socket):
+        """Apply buffer, latency and keep-alive options to an accepted socket"""
+        # A larger kernel receive buffer absorbs bursts between reads
+        client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        # Reap dead peers (30s idle + 3 probes 10s apart) before connection_timeout
+        if hasattr(socket, 'TCP_KEEPIDLE'):
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30)
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10)
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)
         
+    async def _update_clock_periodically(self):
+        """Refresh the coarse clock so receives do not each read the system clock"""
+        while True:
+            await asyncio.sleep(1)
+            self.clock = time.monotonic()
+
+    async def _log_metrics_periodically(self):
+        """Report metrics on a timer, off the message path"""
+        while True:
+            await asyncio.sleep(self.metrics_interval)
+            self.log_metrics()
+
     def log_metrics(self):
         """Log throughput and performance metrics"""
-        current_time = time.time()
+        current_time = time.monotonic()
         elapsed = current_time - self.last_metrics_time
         
-        if elapsed >= self.metrics_interval:
-            messages_per_second = self.messages_processed / elapsed
-            failure_rate = (self.messages_failed / (self.messages_processed + self.messages_failed)) * 100 if self.messages_processed + self.messages_failed > 0 else 0
+        messages_per_second = self.messages_processed / elapsed
+        failure_rate = (self.messages_failed / (self.messages_processed + self.messages_failed)) * 100 if self.messages_processed + self.messages_failed > 0 else 0
+        
+        logger.info("Performance Metrics:")
+        logger.info(f"Messages/second: {messages_per_second:.2f}")
+        logger.info(f"Total processed: {self.messages_processed}")
+        logger.info(f"Total failed: {self.messages_failed}")
+        logger.info(f"Total dropped: {self.messages_dropped}")
+        logger.info(f"Failure rate: {failure_rate:.2f}%")
+        logger.info(f"Active connections: {self.active_connections}")
+        logger.info(f"Total connections: {self.total_connections}")
+        logger.info(f"Rejected connections: {self.connections_rejected}")
+        
+        # Reset counters
+        self.messages_processed = 0
+        self.messages_failed = 0
+        self.messages_dropped = 0
+        self.connections_rejected = 0
+        self.last_metrics_time = current_time
+
+    def process_message(self, message: memoryview, address: tuple):
+        """Validate an individual GELF message and add it to the outgoing batch"""
+        try:
+            # msgspec skips undeclared fields without checking their encoding,
+            # and one invalid byte would make the upstream reject a whole batch
+            str(message, 'utf-8')
+            # Validate only; the original bytes are forwarded as-is
+            _GELF_DECODER.decode(message)
+        except (msgspec.DecodeError, UnicodeDecodeError):
+            self.messages_failed += 1
+            return
+        
+        # Hard cap on staged messages; reads are normally paused long before this
+        if self.batch_bytes >= self.batch_max_bytes * self.max_queued_batches:
+            self.messages_dropped += 1
+            return
+        
+        # Copy out of the connection buffer, which is reused for later frames
+        self.batch.append(bytes(message))
+        self.batch_bytes += len(message)
+        if len(self.batch) >= self.batch_size or self.batch_bytes >= self.batch_max_bytes:
+            self.flush_batch()
             
-            logger.info(f"Performance Metrics:")
-            logger.info(f"Messages/second: {messages_per_second:.2f}")
-            logger.info(f"Total processed: {self.messages_processed}")
-            logger.info(f"Total failed: {self.messages_failed}")
-            logger.info(f"Failure rate: {failure_rate:.2f}%")
-            logger.info(f"Active connections: {self.connections_handled}")
+    async def _flush_periodically(self):
+        """Bound the latency of partially filled batches"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self.flush_batch()
+            
+    def flush_batch(self):
+        """Hand staged messages to the forwarder workers while the queue has room"""
+        while self.batch and not self.forward_queue.full():
+            messages = []
+            size = 0
+            while self.batch and len(messages) < self.batch_size and size < self.batch_max_bytes:
+                message = self.batch.popleft()
+                messages.append(message)
+                size += len(message)
+            self.batch_bytes -= size
             
-            # Reset counters
-            self.messages_processed = 0
-            self.messages_failed = 0
-            self.last_metrics_time = current_time
+            if self.batch_size == 1:
+                body = messages[0]
+            else:
+                # Messages are already valid JSON, so the array is built without re-encoding
+                body = b'[' + b','.join(messages) + b']'
+            if self.compress:
+                body = self.compress(body)
+            self.forward_queue.put_nowait((body, len(messages), 0))
+        self._pause_reading_if_full()
+        
+    def _pause_reading_if_full(self):
+        # Stop reading from clients while the upstream is saturated
+        if self.forward_queue.full() and not self.reading_paused:
+            self.reading_paused = True
+            for connection in self.connections:
+                connection.transport.pause_reading()
+        
+    def _resume_reading_if_drained(self):
+        if (self.reading_paused and self.forward_queue.qsize() <= self.max_queued_batches // 2
+                and len(self.batch) < self.batch_size and self.batch_bytes < self.batch_max_bytes):
+            self.reading_paused = False
+            for connection in self.connections:
+                connection.transport.resume_reading()
 
-    def process_message(self, message: str, address: tuple):
-        """Process and forward individual GELF messages"""
+    async def _forward_queued_batches(self):
+        """Forwarder worker: post queued batches one at a time"""
+        while True:
+            body, count, attempt = await self.forward_queue.get()
+            # Refill from messages staged while the queue was full
+            if len(self.batch) >= self.batch_size or self.batch_bytes >= self.batch_max_bytes:
+                self.flush_batch()
+            self._resume_reading_if_drained()
+            try:
+                await self.forward_batch(body, count, attempt)
+            finally:
+                self.forward_queue.task_done()
+
+    async def forward_batch(self, body: bytes, count: int, attempt: int):
+        """Forward a batch of GELF messages as a single request"""
         try:
-            gelf_data = json.loads(message)
-            response = self.forward_to_function(gelf_data)
+            status = await self.forward_to_function(body)
             
-            if response.status_code not in (200, 201, 202):
-                logger.error(f"Error forwarding message: HTTP {response.status_code}")
-                self.messages_failed += 1
-            else:
-                self.messages_processed += 1
+            if status in (200, 201, 202):
+                self.messages_processed += count
+                return
+            error = f"HTTP {status}"
+            retryable = status in (502, 503, 504)
             
-            # Log metrics periodically
-            self.log_metrics()
-                
-        except json.JSONDecodeError:
-            self.messages_failed += 1
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error = str(e) or type(e).__name__
+            retryable = True
         except Exception as e:
-            logger.error(f"Error in process_message: {e}")
-            self.messages_failed += 1
+            logger.error("Error in forward_batch: %s", e)
+            self.messages_failed += count
+            return
+        
+        if retryable and attempt + 1 < self.max_attempts:
+            self.schedule_retry(body, count, attempt + 1)
+        else:
+            logger.error("Error forwarding batch: %s", error)
+            self.messages_failed += count
             
-    def forward_to_function(self, gelf_data: dict) -> requests.Response:
-        """Forward GELF data to Azure Function"""
-        retries = 3
-        retry_delay = 1
+    def schedule_retry(self, body: bytes, count: int, attempt: int):
+        """Queue a failed batch for another attempt after a jittered exponential backoff"""
+        if self.queued_retries >= self.max_queued_retries:
+            logger.error("Retry queue full, dropping batch of %d messages", count)
+            self.messages_failed += count
+            return
         
-        for attempt in range(retries):
-            try:
-                response = requests.post(
-                    self.function_url,
-                    json=gelf_data,
-                    headers={'Content-Type': 'application/json'},
-                    timeout=10
-                )
-                return response
-                
-            except requests.RequestException as e:
-                if attempt == retries - 1:
-                    raise
-                time.sleep(retry_delay * (attempt + 1))
+        self.queued_retries += 1
+        self.queued_retry_messages += count
+        delay = random.uniform(0.5, 1.5) * self.retry_delay * 2 ** attempt
+        # A timer per batch, so a long backoff never holds up batches due sooner
+        asyncio.get_running_loop().call_later(
+            delay, self.retry_queue.put_nowait, (body, count, attempt))
+            
+    async def _retry_failed_batches(self):
+        """Re-post failed batches once their backoff has elapsed"""
+        while True:
+            body, count, attempt = await self.retry_queue.get()
+            # Retries wait for room instead of being dropped
+            await self.forward_queue.put((body, count, attempt))
+            self.queued_retries -= 1
+            self.queued_retry_messages -= count
+            self._pause_reading_if_full()
+            
+    async def forward_to_function(self, body: bytes) -> int:
+        """Forward a serialized GELF payload to Azure Function, returning the HTTP status"""
+        async with self.http_client.post(
+            self.request_url,
+            data=body,
+            headers=self.request_headers
+        ) as response:
+            return response.status
                 
     def shutdown(self):
         """Gracefully shutdown the server"""
         if self.server_socket:
             self.server_socket.close()
-            logger.info("Server shutdown complete")
+        logger.info("Server shutdown complete")
 
-    def log_debug(self, message: str):
-        """Helper method to ensure immediate output"""
-        logger.info(message)
-        print(message, flush=True)
-        sys.stdout.flush()
+def serve_forever(forwarder: GELFForwarder):
+    """Run a forwarder until interrupted"""
+    try:
+        forwarder.start()
+    except KeyboardInterrupt:
+        logger.info("Shutting down server...")
+        forwarder.shutdown()
 
 if __name__ == "__main__":
     import argparse
+    import multiprocessing
     
     parser = argparse.ArgumentParser(description='GELF TCP to HTTP Forwarder')
     parser.add_argument('--host', default='0.0.0.0', help='TCP server host')
@@ -197,12 +602,29 @@ if __name__ == "__main__":
     parser.add_argument('--debug', action='store_true', help='Enable debug logging')
     parser.add_argument('--connection-timeout', type=int, default=60, help='Connection timeout in seconds')
     parser.add_argument('--max-message-size', type=int, default=1024*1024, help='Maximum message size in bytes')
+    parser.add_argument('--max-concurrent-requests', type=int, default=64, help='Maximum number of in-flight HTTP requests')
+    parser.add_argument('--batch-size', type=int, default=100, help='Maximum number of messages per HTTP request')
+    parser.add_argument('--batch-max-bytes', type=int, default=256*1024, help='Maximum size of a batch in bytes')
+    parser.add_argument('--flush-interval', type=float, default=0.25, help='Maximum seconds a message waits in a partial batch')
+    parser.add_argument('--max-queued-batches', type=int, default=100, help='Maximum number of batches waiting to be forwarded')
+    parser.add_argument('--compression', choices=['none', 'gzip', 'zstd'], default='none', help='Content-Encoding for HTTP request bodies')
+    parser.add_argument('--zstd-dictionary', help='Path to a trained zstd dictionary used with --compression zstd')
+    parser.add_argument('--max-connections', type=int, default=1024, help='Maximum number of concurrent client connections per worker')
+    parser.add_argument('--workers', type=int, default=1, help='Number of worker processes sharing the TCP port')
     
     args = parser.parse_args()
     
     if not args.function_url:
         parser.error("Function URL must be provided either via --function-url argument or FUNCTION_URL environment variable")
     
+    zstd_dictionary = None
+    if args.zstd_dictionary:
+        with open(args.zstd_dictionary, 'rb') as dictionary_file:
+            zstd_dictionary = dictionary_file.read()
+    
+    if args.workers > 1 and not hasattr(socket, 'SO_REUSEPORT'):
+        parser.error("--workers requires SO_REUSEPORT support")
+    
     if args.debug:
         logger.setLevel(logging.DEBUG)
     
@@ -211,11 +633,36 @@ if __name__ == "__main__":
         args.port, 
         args.function_url,
         connection_timeout=args.connection_timeout,
-        max_message_size=args.max_message_size
+        max_message_size=args.max_message_size,
+        max_concurrent_requests=args.max_concurrent_requests,
+        batch_size=args.batch_size,
+        batch_max_bytes=args.batch_max_bytes,
+        flush_interval=args.flush_interval,
+        max_queued_batches=args.max_queued_batches,
+        compression=args.compression,
+        zstd_dictionary=zstd_dictionary,
+        max_connections=args.max_connections,
+        reuse_port=args.workers > 1
     )
     
-    try:
-        forwarder.start()
-    except KeyboardInterrupt:
-        logger.info("Shutting down server...")
-        forwarder.shutdown()
\ No newline at end of file
+    if args.workers > 1:
+        # Each worker runs its own event loop on its own listening socket
+        context = multiprocessing.get_context('fork')
+        workers = [context.Process(target=serve_forever, args=(forwarder,)) for _ in range(args.workers)]
+        for worker in workers:
+            worker.start()
+        # Pass docker stop on to the workers and wait for them to drain
+        def forward_signal(signum, frame):
+            for worker in workers:
+                if worker.is_alive():
+                    os.kill(worker.pid, signum)
+        signal.signal(signal.SIGTERM, forward_signal)
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            # Workers receive the interrupt too and shut themselves down
+            for worker in workers:
+                worker.join()
+    else:
+        serve_forever(forwarder)
\ No newline at end of file
@@ -0,0 +1,105 @@
+import json
+import unittest
+from unittest import mock
+
+import graylogHUB
+
+
+def gelf(n: int) -> bytes:
+    return json.dumps({'host': 'test', 'short_message': f'message {n}'}).encode()
+
+
+class FramingTest(unittest.TestCase):
+    def setUp(self):
+        self.forwarder = graylogHUB.GELFForwarder('127.0.0.1', 12201, 'http://localhost/api', max_message_size=200)
+        self.protocol = graylogHUB.GELFClientProtocol(self.forwarder)
+        self.protocol.transport = mock.Mock()
+        self.protocol.address = ('127.0.0.1', 50000)
+
+    def feed(self, data: bytes):
+        self.forwarder.receive_view[:len(data)] = data
+        self.protocol.buffer_updated(len(data))
+
+    def test_undelimited_recovers_after_oversized_message(self):
+        oversized = json.dumps({'host': 'test', 'short_message': 'x' * 500}).encode()
+        self.feed(oversized[:260])
+        self.feed(oversized[260:] + gelf(1) + gelf(2) + gelf(3))
+        self.assertEqual(list(self.forwarder.batch), [gelf(1), gelf(2), gelf(3)])
+        self.assertEqual(self.forwarder.messages_failed, 2)
+        self.assertFalse(self.protocol.discarding)
+
+    def test_undelimited_skips_malformed_object(self):
+        self.feed(b'{bad}' + gelf(1) + b'\n' + gelf(2) + gelf(3))
+        self.assertEqual(list(self.forwarder.batch), [gelf(1), gelf(2), gelf(3)])
+        self.assertEqual(self.forwarder.messages_failed, 1)
+        self.assertEqual(self.protocol.buffer, b'')
+
+    def test_undelimited_non_ascii_whitespace_keeps_offsets(self):
+        self.feed(gelf(1) + '\u00a0'.encode() + gelf(2))
+        self.assertEqual(list(self.forwarder.batch), [gelf(1), gelf(2)])
+        self.assertEqual(self.forwarder.messages_failed, 1)
+
+    def test_undelimited_waits_for_incomplete_object(self):
+        message = json.dumps({'host': 'test', 'short_message': 'a}b', 'extra': {'c': 1}}).encode()
+        for split in range(1, len(message)):
+            self.feed(message[:split])
+            self.feed(message[split:])
+        self.assertEqual(len(self.forwarder.batch), len(message) - 1)
+        self.assertEqual(self.forwarder.messages_failed, 0)
+
+    def test_undelimited_trailing_whitespace(self):
+        self.feed(gelf(1) + b'\n\n' + gelf(2) + b'\n ')
+        self.assertEqual(list(self.forwarder.batch), [gelf(1), gelf(2)])
+        self.protocol.eof_received()
+        self.assertEqual(self.forwarder.messages_failed, 0)
+
+    def test_undelimited_flushed_at_eof(self):
+        self.feed(gelf(1) + b'\n' + gelf(2) + b'\n ' + b'{"host": "test"')
+        self.protocol.eof_received()
+        self.assertEqual(list(self.forwarder.batch), [gelf(1), gelf(2)])
+        self.assertEqual(self.forwarder.messages_failed, 1)
+
+    def test_undelimited_drops_oversized_object_within_one_read(self):
+        oversized = json.dumps({'host': 'test', 'short_message': 'x' * 180}).encode()
+        self.feed(oversized + gelf(1))
+        self.assertEqual(list(self.forwarder.batch), [gelf(1)])
+        self.assertEqual(self.forwarder.messages_failed, 1)
+
+    def test_delimited_frame_written_in_pieces(self):
+        self.feed(gelf(1) + b'\x00')
+        self.feed(gelf(2))
+        self.assertEqual(list(self.forwarder.batch), [gelf(1)])
+        self.feed(b'\x00')
+        self.assertEqual(list(self.forwarder.batch), [gelf(1), gelf(2)])
+
+    def test_delimited_discards_rest_of_oversized_frame(self):
+        self.feed(gelf(1) + b'\x00' + b'{"host": "test", "short_message": "' + b'x' * 300)
+        self.feed(b'x' * 100 + b'"}\x00' + gelf(2) + b'\x00')
+        self.assertEqual(list(self.forwarder.batch), [gelf(1), gelf(2)])
+        self.assertEqual(self.forwarder.messages_failed, 1)
+
+    def test_invalid_utf8_in_declared_field(self):
+        self.feed(b'{"host": "\xff", "short_message": "b"}\x00' + gelf(1) + b'\x00')
+        self.assertEqual(list(self.forwarder.batch), [gelf(1)])
+        self.assertEqual(self.forwarder.messages_failed, 1)
+        self.protocol.transport.close.assert_not_called()
+
+    def test_invalid_utf8_in_undeclared_field(self):
+        self.feed(b'{"host": "test", "short_message": "b", "_x": "\xff"}\x00' + gelf(1) + b'\x00')
+        self.assertEqual(list(self.forwarder.batch), [gelf(1)])
+        self.assertEqual(self.forwarder.messages_failed, 1)
+
+    def test_validates_routing_fields_only(self):
+        self.feed(b'{"host": "test"}\x00{"host": "test", "level": "info"}\x00{"short_message": "b"}\x00')
+        self.assertEqual(list(self.forwarder.batch), [b'{"host": "test"}'])
+        self.assertEqual(self.forwarder.messages_failed, 2)
+
+    def test_delimited_drops_oversized_frame_within_one_read(self):
+        oversized = json.dumps({'host': 'test', 'short_message': 'x' * 500}).encode()
+        self.feed(gelf(1) + b'\x00' + oversized + b'\x00' + gelf(2) + b'\x00')
+        self.assertEqual(list(self.forwarder.batch), [gelf(1), gelf(2)])
+        self.assertEqual(self.forwarder.messages_failed, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()